@@ -6,40 +6,167 @@ Simple, reliable, and scalable
 """
 
 import os
-import json
+import sys
+import queue
+import atexit
+import hashlib
 import time
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_DOWN
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import orjson
+import requests
+import websockets
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import OrderArgs, OrderType
 from py_clob_client.constants import POLYGON
 
+try:
+    import uvloop  # libuv-backed event loop; optional and unavailable on Windows
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging - records are queued and written by a background
+# thread so file and console I/O never block the event loop
+_log_queue = queue.Queue(-1)
+# The console can be quieter than the log file, e.g. CONSOLE_LOG_LEVEL=WARNING
+_console_level = (os.getenv('CONSOLE_LOG_LEVEL') or 'INFO').upper()
+_console_level_valid = _console_level in logging.getLevelNamesMapping()
+_console_handler = logging.StreamHandler()
+_console_handler.setLevel(_console_level if _console_level_valid else logging.INFO)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('polymarket_bot.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
+)
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler('polymarket_bot.log'),
+    _console_handler,
+    respect_handler_level=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
+if not _console_level_valid:
+    logger.warning("Unknown CONSOLE_LOG_LEVEL %r - using INFO", _console_level)
+
+# API endpoints
+CLOB_HOST = "https://clob.polymarket.com"
+POSITIONS_URL = "https://data-api.polymarket.com/positions"
+MARKETS_URL = "https://gamma-api.polymarket.com/markets"
+MIDPOINT_URL = f"{CLOB_HOST}/midpoint"
+MARKET_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+
+# Bot state persisted across restarts
+STATE_FILE = 'bot_state.json'
+MARKET_CACHE_FILE = 'market_cache.json'
+
+# Upper bound on cached market entries (least recently used are evicted first)
+MARKET_CACHE_MAX_SIZE = 1000
+
+# The cache can hold that many full gamma market objects, so it is written to
+# disk at most this often (in seconds) and once more at shutdown
+MARKET_CACHE_SAVE_INTERVAL = 300
+
+# Order pricing: cross the midpoint by a fixed slippage, within the valid price range
+PRICE_SLIPPAGE = 0.05
+MIN_PRICE = 0.01
+MAX_PRICE = 0.99
+FALLBACK_BUY_PRICE = 0.90
+FALLBACK_SELL_PRICE = 0.10
+
+# Copy orders placed at once when several trades land in one tick
+MAX_CONCURRENT_ORDERS = 4
+
+# Worker threads for blocking HTTP and order signing; kept within the HTTP pool size
+IO_WORKERS = 16
+
+# Closed or inactive markets can still resolve, so cache them only briefly
+CLOSED_MARKET_TTL = 300
+
+# Seconds before retrying a market lookup that failed
+MARKET_MISS_TTL = 60
+
+# Market channel events that mean a trade just printed
+WS_TRADE_EVENTS = frozenset({'last_trade_price'})
+
+# The market channel drops connections that don't send a text PING this often
+WS_PING_INTERVAL = 10
+
+# Idle poll interval the backoff starts from. Busy markets trade constantly, so
+# stream wake-ups never start a poll sooner than this after the last tick either.
+BASE_POLL_INTERVAL = 5
+
+# Browser-like headers so CLOB requests get past Cloudflare
+CLOB_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin'
+}
+
+
+def create_http_session() -> requests.Session:
+    """Create a pooled keep-alive session with retries on transient errors"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Write JSON to a temp file and swap it in so a crash never leaves a torn file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_path, path)
 
 
 class PolymarketCopyBotPro:
     """Professional Polymarket copy trading bot using fixed bet percentage"""
     
+    __slots__ = (
+        'target_wallet', 'your_private_key', 'http', 'client', 'your_wallet',
+        'copy_percentage', '_copy_ratio', 'min_bet_size', 'max_bet_size', 'use_websocket', 'market_ttl',
+        'last_target_positions', 'current_target_positions', 'your_positions',
+        '_dirty', '_positions_cache', 'market_cache', '_market_cache_dirty', '_market_cache_saved_at',
+        '_market_inflight', '_market_misses',
+        '_trade_event', '_idle_ticks', '_quiet_check_counter',
+    )
+    
     def __init__(self):
         # Configuration
         self.target_wallet = os.getenv('TARGET_WALLET_ADDRESS', '').lower()
         self.your_private_key = os.getenv('YOUR_PRIVATE_KEY')
         
+        # Shared HTTP session - reuses TLS connections across polls
+        self.http = create_http_session()
+        
         # Validate private key
         if not self.your_private_key:
             logger.error("❌ YOUR_PRIVATE_KEY not set!")
@@ -49,13 +176,16 @@ class PolymarketCopyBotPro:
         
         # NEW STRATEGY: Copy a fixed % of their bet size
         self.copy_percentage = float(os.getenv('COPY_PERCENTAGE', '0.1'))
+        self._copy_ratio = self.copy_percentage / 100.0
         self.min_bet_size = float(os.getenv('MIN_BET_SIZE', '1'))
         self.max_bet_size = float(os.getenv('MAX_BET_SIZE', '1000'))
+        self.use_websocket = os.getenv('ENABLE_WEBSOCKET', 'true').lower() == 'true'
+        self.market_ttl = float(os.getenv('MARKET_TTL', '86400'))
         
         # Initialize Polymarket client
         try:
             self.client = ClobClient(
-                host="https://clob.polymarket.com",
+                host=CLOB_HOST,
                 key=self.your_private_key,
                 chain_id=POLYGON,
             )
@@ -75,206 +205,383 @@ class PolymarketCopyBotPro:
                     self.client.set_api_creds(api_creds)
                     logger.info("✅ API credentials set via create_or_derive_api_creds")
                 except Exception as e2:
-                    logger.warning(f"Could not set API creds automatically: {e2}")
+                    logger.warning("Could not set API creds automatically: %s", e2)
                     logger.info("ℹ️  Will use private key signing for orders")
             
-            logger.info(f"✅ Connected - Your wallet: {self.your_wallet}")
+            logger.info("✅ Connected - Your wallet: %s", self.your_wallet)
         except Exception as e:
-            logger.error(f"Failed to initialize client: {e}")
+            logger.error("Failed to initialize client: %s", e)
             self.client = None
             self.your_wallet = None
         
-        # Position tracking for detecting trades
+        # Position tracking for detecting trades. Snapshots are rotated by
+        # reference each tick and never mutated in place.
         self.last_target_positions = {}
         self.current_target_positions = {}
         self.your_positions = {}
+        self._dirty = False  # state changed since the last save
+        
+        # Last positions response per wallet: (etag, body digest, parsed positions)
+        self._positions_cache = {}
+        
+        # Market cache: token_id -> (expires_at, market_info, etag), in LRU order
+        self.market_cache = OrderedDict()
+        self._market_cache_dirty = False
+        self._market_cache_saved_at = time.monotonic()
+        self._market_inflight = {}  # token_id -> pending fetch task
+        self._market_misses = {}  # token_id -> monotonic time of next retry
         
-        # Market cache
-        self.market_cache = {}
+        # Set by the trade stream to cut the poll sleep short
+        self._trade_event = asyncio.Event()
+        self._idle_ticks = 0
+        self._quiet_check_counter = 0
         
     def load_state(self):
         """Load previous state from file"""
         try:
-            if os.path.exists('bot_state.json'):
-                with open('bot_state.json', 'r') as f:
-                    data = json.load(f)
+            if os.path.exists(STATE_FILE):
+                with open(STATE_FILE, 'rb') as f:
+                    data = orjson.loads(f.read())
                     self.last_target_positions = data.get('last_target_positions', {})
                     self.your_positions = data.get('your_positions', {})
-                logger.info(f"Loaded previous state")
+                logger.info("Loaded previous state")
         except Exception as e:
-            logger.error(f"Error loading state: {e}")
+            logger.error("Error loading state: %s", e)
     
-    def save_state(self):
-        """Save current state to file"""
+    def save_state(self, final: bool = False):
+        """Save current state to file if it changed since the last save
+        
+        The market cache is flushed along with it every MARKET_CACHE_SAVE_INTERVAL,
+        or unconditionally on the final save at shutdown.
+        """
+        if self._market_cache_dirty and (
+            final or time.monotonic() - self._market_cache_saved_at >= MARKET_CACHE_SAVE_INTERVAL
+        ):
+            self.save_market_cache()
+        
+        if not self._dirty:
+            return
+        
         try:
             data = {
                 'last_target_positions': self.last_target_positions,
                 'your_positions': self.your_positions,
-                'updated_at': datetime.now().isoformat()
+                'updated_at': time.time()
+            }
+            write_json_atomic(STATE_FILE, data)
+            self._dirty = False
+        except Exception as e:
+            logger.error("Error saving state: %s", e)
+    
+    def load_market_cache(self):
+        """Load market info saved by a previous run"""
+        try:
+            if not os.path.exists(MARKET_CACHE_FILE):
+                return
+            
+            with open(MARKET_CACHE_FILE, 'rb') as f:
+                data = orjson.loads(f.read())
+            
+            # Expiry is stored as a wall-clock time; convert back to the monotonic clock
+            offset = time.monotonic() - time.time()
+            now = time.monotonic()
+            for token_id, (expires_at, market_info, etag) in data.items():
+                expires_at += offset
+                # Expired entries are only worth keeping if they can be revalidated
+                if expires_at > now or etag:
+                    self.market_cache[token_id] = (expires_at, market_info, etag)
+            
+            while len(self.market_cache) > MARKET_CACHE_MAX_SIZE:
+                self.market_cache.popitem(last=False)
+            
+            logger.info("Loaded %d cached markets", len(self.market_cache))
+        except Exception as e:
+            logger.error("Error loading market cache: %s", e)
+    
+    def save_market_cache(self):
+        """Save the market cache so a restart starts warm"""
+        try:
+            offset = time.time() - time.monotonic()
+            data = {
+                token_id: (expires_at + offset, market_info, etag)
+                for token_id, (expires_at, market_info, etag) in self.market_cache.items()
             }
-            with open('bot_state.json', 'w') as f:
-                json.dump(data, f, indent=2)
+            write_json_atomic(MARKET_CACHE_FILE, data)
+            self._market_cache_dirty = False
+            self._market_cache_saved_at = time.monotonic()
         except Exception as e:
-            logger.error(f"Error saving state: {e}")
+            logger.error("Error saving market cache: %s", e)
     
     def get_all_positions(self, wallet_address: str) -> Dict[str, float]:
-        """Get all current positions for a wallet"""
+        """Get all current positions for a wallet
+        
+        Unchanged responses (304, or a byte-identical body) return the
+        previously parsed dict without decoding the JSON again.
+        """
         try:
-            import requests
+            cached = self._positions_cache.get(wallet_address)
+            headers = {'If-None-Match': cached[0]} if cached and cached[0] else None
+            response = self.http.get(POSITIONS_URL, params={"user": wallet_address}, headers=headers, timeout=10)
             
-            url = f"https://data-api.polymarket.com/positions"
-            response = requests.get(url, params={"user": wallet_address}, timeout=10)
+            if response.status_code == 304 and cached:
+                return cached[2]
             
             positions = {}
             if response.status_code == 200:
-                data = response.json()
+                digest = hashlib.blake2b(response.content, digest_size=16).digest()
+                if cached and cached[1] == digest:
+                    return cached[2]
+                
+                data = orjson.loads(response.content)
                 
                 if isinstance(data, list):
-                    for position in data:
-                        asset = position.get('asset')
-                        size = float(position.get('size', 0))
-                        if asset and size > 0:
-                            positions[asset] = size
+                    # Token IDs recur every poll; interning makes diff lookups pointer compares
+                    intern = sys.intern
+                    positions = {
+                        intern(asset): size
+                        for position in data
+                        if (asset := position.get('asset')) and (size := float(position.get('size', 0))) > 0
+                    }
+                    self._positions_cache[wallet_address] = (response.headers.get('ETag'), digest, positions)
                 else:
-                    logger.warning(f"⚠️ Unexpected response format: {type(data)}")
+                    logger.warning("⚠️ Unexpected response format: %s", type(data))
             else:
-                logger.error(f"❌ API returned status {response.status_code}")
+                logger.error("❌ API returned status %s", response.status_code)
             
             return positions
             
         except Exception as e:
-            logger.error(f"Error getting positions: {e}")
+            logger.error("Error getting positions: %s", e)
             return {}
     
-    def get_market_info(self, token_id: str) -> Optional[Dict]:
-        """Get market information with caching"""
-        if token_id in self.market_cache:
-            return self.market_cache[token_id]
+    def _cached_market_info(self, token_id: str) -> Optional[Dict]:
+        """Return cached market info if present and not expired
+        
+        Expired entries with an ETag are kept so the next fetch can revalidate them.
+        """
+        entry = self.market_cache.get(token_id)
+        if entry is None:
+            return None
+        
+        expires_at, market_info, etag = entry
+        if time.monotonic() >= expires_at:
+            if not etag:
+                del self.market_cache[token_id]
+            return None
+        
+        self.market_cache.move_to_end(token_id)
+        return market_info
+    
+    def _cache_market_info(self, token_id: str, market_info: Dict, etag: Optional[str] = None):
+        """Store market info, evicting expired and least recently used entries"""
+        now = time.monotonic()
+        closed = market_info.get('closed') is True or market_info.get('active') is False
+        ttl = CLOSED_MARKET_TTL if closed else self.market_ttl
+        self.market_cache[token_id] = (now + ttl, market_info, etag)
+        self.market_cache.move_to_end(token_id)
+        self._market_cache_dirty = True
         
+        while self.market_cache:
+            oldest_id, (expires_at, _, oldest_etag) = next(iter(self.market_cache.items()))
+            if (expires_at > now or oldest_etag) and len(self.market_cache) <= MARKET_CACHE_MAX_SIZE:
+                break
+            del self.market_cache[oldest_id]
+    
+    def _fetch_market_info(self, token_id: str,
+                           stale: Optional[Tuple[Dict, str]] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """Fetch market information from the gamma API, returning (info, etag)
+        
+        With a stale (info, etag) pair the request is conditional and a 304
+        returns the stale info without a body transfer.
+        """
         try:
-            import requests
-            url = f"https://gamma-api.polymarket.com/markets/{token_id}"
-            response = requests.get(url, timeout=10)
+            headers = {'If-None-Match': stale[1]} if stale else None
+            response = self.http.get(f"{MARKETS_URL}/{token_id}", headers=headers, timeout=10)
             
+            if response.status_code == 304 and stale:
+                return stale
             if response.status_code == 200:
-                market_info = response.json()
-                self.market_cache[token_id] = market_info
-                return market_info
-            return None
+                market_info = orjson.loads(response.content)
+                if isinstance(market_info, dict):
+                    return market_info, response.headers.get('ETag')
+            return None, None
         except Exception as e:
-            logger.error(f"Error getting market info: {e}")
+            logger.error("Error getting market info: %s", e)
+            return None, None
+    
+    async def _load_market_info(self, token_id: str) -> Optional[Dict]:
+        """Fetch market information on a worker thread and cache it"""
+        try:
+            entry = self.market_cache.get(token_id)
+            stale = (entry[1], entry[2]) if entry and entry[2] else None
+            market_info, etag = await asyncio.to_thread(self._fetch_market_info, token_id, stale)
+            if market_info is not None:
+                self._cache_market_info(token_id, market_info, etag)
+                self._market_misses.pop(token_id, None)
+            else:
+                now = time.monotonic()
+                self._market_misses = {t: retry_at for t, retry_at in self._market_misses.items() if retry_at > now}
+                self._market_misses[token_id] = now + MARKET_MISS_TTL
+            return market_info
+        finally:
+            self._market_inflight.pop(token_id, None)
+    
+    async def get_market_info(self, token_id: str) -> Optional[Dict]:
+        """Get market information with caching, without blocking the event loop"""
+        market_info = self._cached_market_info(token_id)
+        if market_info is not None:
+            return market_info
+        
+        # Don't hammer the API for a token that just failed to resolve
+        if self._market_misses.get(token_id, 0) > time.monotonic():
             return None
+        
+        # Concurrent callers for the same token share a single request
+        task = self._market_inflight.get(token_id)
+        if task is None:
+            task = asyncio.create_task(self._load_market_info(token_id))
+            self._market_inflight[token_id] = task
+        return await asyncio.shield(task)
+    
+    async def warm_market_cache(self):
+        """Prefetch market info for tracked tokens so the first trade after a restart doesn't wait on it"""
+        tokens = [t for t in self.last_target_positions if self._cached_market_info(t) is None]
+        if not tokens:
+            return
+        
+        # Bounded fan-out to stay clear of gamma-api rate limits
+        semaphore = asyncio.Semaphore(8)
+        
+        async def fetch(token_id):
+            async with semaphore:
+                return await self.get_market_info(token_id)
+        
+        # Warming is best effort - a failed lookup must not abort startup
+        results = await asyncio.gather(*(fetch(t) for t in tokens), return_exceptions=True)
+        warmed = sum(isinstance(market_info, dict) for market_info in results)
+        logger.info("Warmed market cache for %d of %d tokens", warmed, len(tokens))
     
     def calculate_copy_size(self, target_bet_size: float) -> float:
         """Calculate copy bet size as fixed percentage of their bet"""
         try:
-            your_bet_size = target_bet_size * (self.copy_percentage / 100)
+            your_bet_size = target_bet_size * self._copy_ratio
             
             if your_bet_size < self.min_bet_size:
-                logger.debug(f"Bet ${your_bet_size:.2f} below minimum ${self.min_bet_size}")
+                logger.debug("Bet $%.2f below minimum $%s", your_bet_size, self.min_bet_size)
                 return 0.0
             
             your_bet_size = min(your_bet_size, self.max_bet_size)
             
-            logger.info(f"📊 Target bet: ${target_bet_size:.2f}")
-            logger.info(f"📊 Your bet: ${your_bet_size:.2f} ({self.copy_percentage}% of their bet)")
+            logger.info("📊 Target bet: $%.2f", target_bet_size)
+            logger.info("📊 Your bet: $%.2f (%s%% of their bet)", your_bet_size, self.copy_percentage)
             
             return your_bet_size
             
         except Exception as e:
-            logger.error(f"Error calculating copy size: {e}")
+            logger.error("Error calculating copy size: %s", e)
             return 0.0
     
-    def place_market_order(self, token_id: str, size: float, side: str) -> bool:
-        """Place a market order on Polymarket"""
+    def get_midpoint(self, token_id: str) -> Optional[float]:
+        """Get the current midpoint price for a token, or None if unavailable"""
+        response = self.http.get(
+            MIDPOINT_URL,
+            params={"token_id": token_id},
+            headers=CLOB_HEADERS,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            return float(orjson.loads(response.content).get('mid', 0.5))
+        
+        logger.warning("Could not get midpoint (status %s)", response.status_code)
+        return None
+    
+    async def place_market_order(self, token_id: str, size: float, side: str,
+                                 midpoint: Optional[float] = None) -> bool:
+        """Place a market order on Polymarket, priced off a prefetched midpoint if given
+        
+        BUY sizes are dollars to spend; SELL sizes are shares to sell.
+        """
         try:
             if not self.client:
                 logger.error("Client not initialized")
                 return False
             
             if size < 0.01:
-                logger.warning(f"Size ${size:.4f} too small to execute")
+                logger.warning("Size %.4f too small to execute", size)
                 return False
             
-            size_in_units = int(size * 1e6)
-            
-            import requests
-            
-            # Add proper headers to bypass Cloudflare
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-                'Sec-Ch-Ua-Mobile': '?0',
-                'Sec-Ch-Ua-Platform': '"Windows"',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin'
-            }
-            
-            price_url = f"https://clob.polymarket.com/midpoint"
-            price_response = requests.get(
-                price_url, 
-                params={"token_id": token_id}, 
-                headers=headers,
-                timeout=10
-            )
+            if midpoint is None:
+                midpoint = await asyncio.to_thread(self.get_midpoint, token_id)
             
-            if price_response.status_code == 200:
-                midpoint = float(price_response.json().get('mid', 0.5))
+            if midpoint is not None:
                 if side == "BUY":
-                    price = min(0.99, midpoint + 0.05)
+                    price = min(MAX_PRICE, midpoint + PRICE_SLIPPAGE)
                 else:
-                    price = max(0.01, midpoint - 0.05)
+                    price = max(MIN_PRICE, midpoint - PRICE_SLIPPAGE)
             else:
-                logger.warning(f"Could not get midpoint (status {price_response.status_code}), using fallback")
-                price = 0.90 if side == "BUY" else 0.10
-            
-            logger.info(f"📤 Placing {side} order: ${size:.2f} @ {price:.2f} on token {token_id[:10]}...")
+                logger.warning("Using fallback price")
+                price = FALLBACK_BUY_PRICE if side == "BUY" else FALLBACK_SELL_PRICE
+            
+            # OrderArgs.size is a share count (the SDK scales it to token units itself).
+            # Round down through the decimal repr so we never spend or sell more than asked.
+            amount = Decimal(str(size))
+            if side == "BUY":
+                amount /= Decimal(str(price))
+            shares = float(amount.quantize(Decimal('0.01'), ROUND_DOWN))
+            
+            logger.info("📤 Placing %s order: %.2f shares @ %.2f (~$%.2f) on token %s...",
+                        side, shares, price, shares * price, token_id[:10])
+            
+            order_args = OrderArgs(
+                token_id=token_id,
+                price=price,
+                size=shares,
+                side=side,
+                fee_rate_bps=0,
+            )
             
             # Add retry logic for Cloudflare blocks
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    order_args = OrderArgs(
-                        token_id=token_id,
-                        price=price,
-                        size=size_in_units,
-                        side=side,
-                        fee_rate_bps=0,
-                    )
-                    
-                    signed_order = self.client.create_order(order_args)
-                    resp = self.client.post_order(signed_order, OrderType.FOK)
+                    # Signing and posting are blocking SDK calls - keep them off the event loop
+                    signed_order = await asyncio.to_thread(self.client.create_order, order_args)
+                    resp = await asyncio.to_thread(self.client.post_order, signed_order, OrderType.FOK)
                     
                     if resp.get('success'):
-                        logger.info(f"✅ Order placed! Order ID: {resp.get('orderID')}")
+                        logger.info("✅ Order placed! Order ID: %s", resp.get('orderID'))
                         
+                        # Holdings are tracked in shares at the CLOB's 0.01 precision, so sells can be
+                        # capped at what we own without float drift leaving unsellable dust behind
                         if side == "BUY":
-                            self.your_positions[token_id] = self.your_positions.get(token_id, 0.0) + size
+                            self.your_positions[token_id] = round(self.your_positions.get(token_id, 0.0) + shares, 2)
                         elif side == "SELL":
-                            self.your_positions[token_id] = max(0, self.your_positions.get(token_id, 0.0) - size)
+                            remaining = round(self.your_positions.get(token_id, 0.0) - shares, 2)
+                            # Drop closed positions so the map (and state file) stays bounded by open ones
+                            if remaining < 0.01:
+                                self.your_positions.pop(token_id, None)
+                            else:
+                                self.your_positions[token_id] = remaining
                         
-                        self.save_state()
+                        # Flushed once at the end of the tick rather than per fill
+                        self._dirty = True
                         return True
                     else:
                         error_msg = resp.get('error', 'Unknown error')
                         if 'cloudflare' in error_msg.lower() or 'blocked' in error_msg.lower():
                             if attempt < max_retries - 1:
-                                logger.warning(f"Cloudflare block detected, retry {attempt + 1}/{max_retries}")
-                                time.sleep(2 ** attempt)  # Exponential backoff
+                                logger.warning("Cloudflare block detected, retry %d/%d", attempt + 1, max_retries)
+                                await asyncio.sleep(2 ** attempt)  # Exponential backoff
                                 continue
-                        logger.error(f"❌ Order failed: {error_msg}")
+                        logger.error("❌ Order failed: %s", error_msg)
                         return False
                         
                 except Exception as order_error:
                     error_str = str(order_error)
                     if ('cloudflare' in error_str.lower() or 'blocked' in error_str.lower()) and attempt < max_retries - 1:
-                        logger.warning(f"Cloudflare block detected (exception), retry {attempt + 1}/{max_retries}")
-                        time.sleep(2 ** attempt)
+                        logger.warning("Cloudflare block detected (exception), retry %d/%d", attempt + 1, max_retries)
+                        await asyncio.sleep(2 ** attempt)
                         continue
                     raise
             
@@ -282,146 +589,298 @@ class PolymarketCopyBotPro:
             return False
                 
         except Exception as e:
-            logger.error(f"❌ Error placing order: {e}")
+            logger.error("❌ Error placing order: %s", e)
             return False
     
-    def detect_and_copy_trades(self):
-        """Detect trades by comparing position snapshots"""
+    async def detect_and_copy_trades(self) -> int:
+        """Detect trades by comparing position snapshots, returning how many changed"""
         try:
-            self.current_target_positions = self.get_all_positions(self.target_wallet)
+            self.current_target_positions = await asyncio.to_thread(self.get_all_positions, self.target_wallet)
             
             if not self.last_target_positions:
-                logger.info(f"📊 Initial scan: {len(self.current_target_positions)} positions found")
-                logger.info(f"🔄 Baseline established - now monitoring for changes...")
-                self.last_target_positions = self.current_target_positions.copy()
+                logger.info("📊 Initial scan: %d positions found", len(self.current_target_positions))
+                logger.info("🔄 Baseline established - now monitoring for changes...")
+                self.last_target_positions = self.current_target_positions
+                self._dirty = True
                 self.save_state()
-                return
-            
-            changes_detected = 0
-            all_tokens = set(list(self.last_target_positions.keys()) + list(self.current_target_positions.keys()))
+                return 0
+            
+            last = self.last_target_positions
+            current = self.current_target_positions
+            changes = [
+                (token_id, old_size, new_size, new_size - old_size)
+                for token_id in last.keys() | current.keys()
+                if abs((new_size := current.get(token_id, 0.0)) - (old_size := last.get(token_id, 0.0))) >= 0.01
+            ]
+            
+            changes_detected = len(changes)
+            
+            # A fully exited position usually means the market closed - refetch its info
+            for token_id, old_size, new_size, _ in changes:
+                if new_size == 0 and old_size > 0 and self.market_cache.pop(token_id, None) is not None:
+                    # Persist the eviction too, or a failed refetch leaves it on disk
+                    self._market_cache_dirty = True
+            
+            market_infos = await asyncio.gather(
+                *(self.get_market_info(token_id) for token_id, _, _, _ in changes),
+                return_exceptions=True
+            )
             
-            for token_id in all_tokens:
-                old_size = self.last_target_positions.get(token_id, 0.0)
-                new_size = self.current_target_positions.get(token_id, 0.0)
-                change = new_size - old_size
+            planned = []
+            for (token_id, old_size, new_size, change), market_info in zip(changes, market_infos):
+                logger.info("\n%s", '='*70)
+                logger.info("🎯 TRADE DETECTED!")
+                logger.info("Token: %s", token_id)
+                logger.info("Previous position: $%.2f", old_size)
+                logger.info("New position: $%.2f", new_size)
+                logger.info("Change: $%+.2f", change)
                 
-                if abs(change) < 0.01:
-                    continue
-                
-                changes_detected += 1
-                
-                logger.info(f"\n{'='*70}")
-                logger.info(f"🎯 TRADE DETECTED!")
-                logger.info(f"Token: {token_id}")
-                logger.info(f"Previous position: ${old_size:.2f}")
-                logger.info(f"New position: ${new_size:.2f}")
-                logger.info(f"Change: ${change:+.2f}")
-                
-                market_info = self.get_market_info(token_id)
-                if market_info:
+                if isinstance(market_info, dict):
                     question = market_info.get('question', 'Unknown')
-                    logger.info(f"📋 Market: {question}")
+                    logger.info("📋 Market: %s", question)
                 
+                # Size the copy before touching the order book - skipped copies need no midpoint
                 if change > 0:
-                    self.copy_buy(token_id, abs(change))
+                    side, copy_size = "BUY", self.size_buy_copy(abs(change))
                 else:
-                    self.copy_sell(token_id, abs(change))
+                    side, copy_size = "SELL", self.size_sell_copy(token_id, abs(change), new_size == 0)
+                if copy_size > 0:
+                    planned.append((token_id, side, copy_size))
                 
-                logger.info(f"{'='*70}\n")
+                logger.info("%s\n", '='*70)
             
-            if not hasattr(self, '_quiet_check_counter'):
-                self._quiet_check_counter = 0
+            # Prefetch midpoints only for copies that get an order slot straight away;
+            # queued ones fetch theirs at order time so they aren't priced off a stale quote
+            prefetched = await asyncio.gather(
+                *(asyncio.to_thread(self.get_midpoint, token_id) for token_id, _, _ in planned[:MAX_CONCURRENT_ORDERS]),
+                return_exceptions=True
+            )
+            # A failed prefetch falls back to fetching at order time
+            midpoints = [midpoint if isinstance(midpoint, float) else None for midpoint in prefetched]
+            midpoints += [None] * (len(planned) - len(midpoints))
+            
+            # Place the copies concurrently so one slow order doesn't delay the rest
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_ORDERS)
+            
+            async def bounded(token_id, side, copy_size, midpoint):
+                async with semaphore:
+                    if side == "BUY":
+                        await self.copy_buy(token_id, copy_size, midpoint)
+                    else:
+                        await self.copy_sell(token_id, copy_size, midpoint)
+            
+            await asyncio.gather(*(bounded(*copy, midpoint) for copy, midpoint in zip(planned, midpoints)))
             
             self._quiet_check_counter += 1
             if self._quiet_check_counter >= 12 and changes_detected == 0:
-                logger.info(f"✓ Monitoring {len(self.current_target_positions)} positions - no changes")
+                logger.info("✓ Monitoring %d positions - no changes", len(self.current_target_positions))
                 self._quiet_check_counter = 0
             
-            self.last_target_positions = self.current_target_positions.copy()
+            self.last_target_positions = self.current_target_positions
+            if changes_detected:
+                self._dirty = True
             self.save_state()
+            return changes_detected
             
         except Exception as e:
-            logger.error(f"Error detecting trades: {e}")
+            logger.error("Error detecting trades: %s", e)
+            return 0
+    
+    def size_buy_copy(self, target_buy_size: float) -> float:
+        """Size a BUY copy, returning 0 if it is too small to place"""
+        copy_size = self.calculate_copy_size(target_buy_size)
+        
+        if copy_size < self.min_bet_size:
+            logger.warning("⚠️  Copy size $%.2f below minimum $%s", copy_size, self.min_bet_size)
+            return 0.0
+        return copy_size
+    
+    def size_sell_copy(self, token_id: str, target_sell_size: float, full_exit: bool = False) -> float:
+        """Size a SELL copy in shares, capped at the shares we hold, returning 0 if there is nothing to sell"""
+        your_shares = self.your_positions.get(token_id, 0.0)
+        
+        if your_shares < 0.01:
+            logger.warning("⚠️  No position to sell (you hold %.2f shares)", your_shares)
+            return 0.0
+        
+        # Target position sizes are share counts too. A full exit closes everything,
+        # since our BUY copies were sized in dollars and won't match share for share.
+        shares = your_shares if full_exit else min(target_sell_size * self._copy_ratio, your_shares)
+        
+        if shares < 0.01:
+            logger.warning("⚠️  Sell size %.4f shares too small", shares)
+            return 0.0
+        
+        logger.info("📊 Selling %.2f of your %.2f shares", shares, your_shares)
+        return shares
     
-    def copy_buy(self, token_id: str, target_buy_size: float):
-        """Copy a BUY trade at fixed percentage"""
+    async def copy_buy(self, token_id: str, copy_size: float, midpoint: Optional[float] = None):
+        """Place a BUY copy sized by size_buy_copy"""
         try:
-            copy_size = self.calculate_copy_size(target_buy_size)
-            
-            if copy_size < self.min_bet_size:
-                logger.warning(f"⚠️  Copy size ${copy_size:.2f} below minimum ${self.min_bet_size}")
-                return
-            
-            success = self.place_market_order(token_id, copy_size, "BUY")
+            success = await self.place_market_order(token_id, copy_size, "BUY", midpoint)
             
             if success:
-                logger.info(f"✅ Successfully copied BUY!")
+                logger.info("✅ Successfully copied BUY!")
             else:
-                logger.error(f"❌ Failed to copy BUY")
+                logger.error("❌ Failed to copy BUY")
                 
         except Exception as e:
-            logger.error(f"Error copying buy: {e}")
+            logger.error("Error copying buy: %s", e)
     
-    def copy_sell(self, token_id: str, target_sell_size: float):
-        """Copy a SELL trade at fixed percentage"""
+    async def copy_sell(self, token_id: str, shares: float, midpoint: Optional[float] = None):
+        """Place a SELL copy sized (in shares) by size_sell_copy"""
         try:
-            your_position = self.your_positions.get(token_id, 0.0)
-            
-            if your_position < 0.01:
-                logger.warning(f"⚠️  No position to sell (you have ${your_position:.2f})")
-                return
-            
-            copy_size = self.calculate_copy_size(target_sell_size)
-            copy_size = min(copy_size, your_position)
-            
-            if copy_size < 0.01:
-                logger.warning(f"⚠️  Sell size ${copy_size:.2f} too small")
-                return
-            
-            success = self.place_market_order(token_id, copy_size, "SELL")
+            success = await self.place_market_order(token_id, shares, "SELL", midpoint)
             
             if success:
-                logger.info(f"✅ Successfully copied SELL!")
+                logger.info("✅ Successfully copied SELL!")
             else:
-                logger.error(f"❌ Failed to copy SELL")
+                logger.error("❌ Failed to copy SELL")
                 
         except Exception as e:
-            logger.error(f"Error copying sell: {e}")
+            logger.error("Error copying sell: %s", e)
+    
+    @staticmethod
+    def _has_trade_event(message) -> bool:
+        """Check whether a market channel frame contains a trade"""
+        try:
+            data = orjson.loads(message)
+        except (TypeError, ValueError):
+            return False
+        events = data if isinstance(data, list) else [data]
+        return any(isinstance(e, dict) and e.get('event_type') in WS_TRADE_EVENTS for e in events)
+    
+    @staticmethod
+    async def _send_heartbeats(ws):
+        """Send the application-level PING the market channel expects"""
+        while True:
+            await asyncio.sleep(WS_PING_INTERVAL)
+            await ws.send("PING")
+    
+    async def listen_for_trades(self):
+        """Stream trades on the target's markets and wake the poll loop on each one
+        
+        The CLOB user channel only streams the authenticated account's own
+        fills, so the target's trades are inferred from the public market
+        channel. The REST position diff stays the source of truth.
+        """
+        backoff = 1
+        reconnecting = False
+        while True:
+            subscribed = set(self.last_target_positions)
+            if not subscribed:
+                await asyncio.sleep(5)
+                continue
+            
+            try:
+                async with websockets.connect(MARKET_WS_URL, ping_interval=30) as ws:
+                    await ws.send(orjson.dumps({"assets_ids": sorted(subscribed), "type": "market"}).decode())
+                    logger.info("📡 Streaming trades for %d markets", len(subscribed))
+                    backoff = 1
+                    
+                    # Trades may have printed while we were disconnected - reconcile now.
+                    # A planned resubscribe after a holdings change needs no extra poll.
+                    if reconnecting:
+                        self._trade_event.set()
+                        reconnecting = False
+                    heartbeat = asyncio.create_task(self._send_heartbeats(ws))
+                    
+                    try:
+                        # Reconnect with a fresh subscription once the target's holdings change
+                        while self.last_target_positions.keys() == subscribed:
+                            try:
+                                message = await asyncio.wait_for(ws.recv(), timeout=30)
+                            except asyncio.TimeoutError:
+                                continue
+                            if self._has_trade_event(message):
+                                self._trade_event.set()
+                    finally:
+                        heartbeat.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Trade stream disconnected: %s - reconnecting in %ss", e, backoff)
+                reconnecting = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+    
+    def next_poll_interval(self, changes_detected: int) -> float:
+        """Back off while the target is idle and poll fast right after a trade"""
+        if changes_detected:
+            self._idle_ticks = 0
+            return 2
+        
+        self._idle_ticks += 1
+        return min(60, BASE_POLL_INTERVAL * 2 ** min(self._idle_ticks // 6, 4))
+    
+    async def wait_for_next_check(self, timeout: float):
+        """Sleep until the next poll is due or the trade stream fires
+        
+        Stream wake-ups that arrive within BASE_POLL_INTERVAL of the last tick
+        are merged into a single poll at the end of the gap, so market noise
+        can't push polling past the un-backed-off rate. Polls that find no
+        change still count as idle ticks.
+        """
+        gap = min(BASE_POLL_INTERVAL, timeout)
+        await asyncio.sleep(gap)
+        try:
+            await asyncio.wait_for(self._trade_event.wait(), timeout - gap)
+        except asyncio.TimeoutError:
+            pass
+        self._trade_event.clear()
     
     async def monitor_wallet(self):
         """Main monitoring loop"""
-        logger.info(f"\n🤖 Bot Started - FIXED BET PERCENTAGE MODE")
-        logger.info(f"👀 Monitoring: {self.target_wallet}")
-        logger.info(f"💼 Your wallet: {self.your_wallet}")
-        logger.info(f"📊 Copy percentage: {self.copy_percentage}% of their bet size")
-        logger.info(f"💵 Min: ${self.min_bet_size} | Max: ${self.max_bet_size}")
-        logger.info(f"⚡ Checking every 5 seconds")
-        logger.info(f"{'='*70}\n")
+        logger.info("\n🤖 Bot Started - FIXED BET PERCENTAGE MODE")
+        logger.info("👀 Monitoring: %s", self.target_wallet)
+        logger.info("💼 Your wallet: %s", self.your_wallet)
+        logger.info("📊 Copy percentage: %s%% of their bet size", self.copy_percentage)
+        logger.info("💵 Min: $%s | Max: $%s", self.min_bet_size, self.max_bet_size)
+        logger.info("⚡ Checking every 2-60 seconds (faster while the target is active)")
+        logger.info("📡 Trade stream: %s", 'on' if self.use_websocket else 'off')
+        logger.info("%s\n", '='*70)
+        
+        # Size the pool for concurrent lookups and orders rather than the CPU count
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='bot-io')
+        )
         
-        self.load_state()
+        # The two files are independent, so read them side by side
+        await asyncio.gather(
+            asyncio.to_thread(self.load_state),
+            asyncio.to_thread(self.load_market_cache),
+        )
+        await self.warm_market_cache()
+        self.save_state()
+        
+        listener = asyncio.create_task(self.listen_for_trades()) if self.use_websocket else None
         
         consecutive_errors = 0
         max_errors = 5
         
-        while True:
-            try:
-                self.detect_and_copy_trades()
-                consecutive_errors = 0
-                await asyncio.sleep(5)
-                
-            except KeyboardInterrupt:
-                logger.info("\n🛑 Bot stopped by user")
-                self.save_state()
-                break
-            except Exception as e:
-                consecutive_errors += 1
-                logger.error(f"❌ Error in monitoring loop ({consecutive_errors}/{max_errors}): {e}")
-                
-                if consecutive_errors >= max_errors:
-                    logger.error("Too many consecutive errors. Stopping bot.")
+        try:
+            while True:
+                try:
+                    changes_detected = await self.detect_and_copy_trades()
+                    consecutive_errors = 0
+                    await self.wait_for_next_check(self.next_poll_interval(changes_detected))
+                    
+                except KeyboardInterrupt:
+                    logger.info("\n🛑 Bot stopped by user")
+                    self.save_state()
                     break
-                
-                await asyncio.sleep(30)
+                except Exception as e:
+                    consecutive_errors += 1
+                    logger.error("❌ Error in monitoring loop (%d/%d): %s", consecutive_errors, max_errors, e)
+                    
+                    if consecutive_errors >= max_errors:
+                        logger.error("Too many consecutive errors. Stopping bot.")
+                        break
+                    
+                    await asyncio.sleep(30)
+        finally:
+            if listener:
+                listener.cancel()
     
     def run(self):
         """Start the bot"""
@@ -434,11 +893,15 @@ class PolymarketCopyBotPro:
             return
         
         try:
-            asyncio.run(self.monitor_wallet())
+            if uvloop is not None:
+                uvloop.run(self.monitor_wallet())
+            else:
+                asyncio.run(self.monitor_wallet())
         except Exception as e:
-            logger.error(f"Fatal error: {e}")
+            logger.error("Fatal error: %s", e)
         finally:
-            self.save_state()
+            self.save_state(final=True)
+            self.http.close()
             logger.info("Bot stopped. State saved.")
 
 